@@ -1,21 +1,30 @@
-from operator import itemgetter
+from functools import lru_cache
+import os.path
+import re
 import sys
-from typing import TYPE_CHECKING, List, NoReturn, Optional, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NoReturn,
+    Optional,
+    Set,
+    Tuple,
+    cast,
+)
 
 import click
-from pygments.util import ClassNotFound
-from rich.console import Console, RenderableType
-from rich.markup import escape
-from rich.text import Text
-
-console = Console()
-error_console = Console(stderr=True)
 
 if TYPE_CHECKING:
-    from rich.console import ConsoleOptions, RenderResult
+    from requests import Session
+    from rich.box import Box
+    from rich.console import Console, ConsoleOptions, RenderableType, RenderResult
     from rich.measure import Measurement
+    from rich.text import Text
 
-BOXES = [
+BOXES = (
     "none",
     "ascii",
     "ascii2",
@@ -23,18 +32,27 @@ BOXES = [
     "rounded",
     "heavy",
     "double",
-]
+)
 
 BOX_TEXT = ", ".join(sorted(BOXES))
 
 COMMON_LEXERS = {
     "html": "html",
+    "css": "css",
     "py": "python",
     "md": "markdown",
     "js": "javascript",
+    "ts": "typescript",
     "xml": "xml",
     "json": "json",
     "toml": "toml",
+    "yaml": "yaml",
+    "yml": "yaml",
+    "cpp": "cpp",
+    "go": "go",
+    "rs": "rust",
+    "rb": "ruby",
+    "sh": "bash",
 }
 
 VERSION = "1.8.0"
@@ -51,10 +69,84 @@ INSPECT = 7
 CSV = 8
 IPYNB = 9
 
+EXTENSION_FORMATS = {
+    ".md": MARKDOWN,
+    ".json": JSON,
+    ".csv": CSV,
+    ".tsv": CSV,
+    ".rst": RST,
+    ".ipynb": IPYNB,
+}
+
+_IS_NUMBER = re.compile(r"-?[0-9]*\.?[0-9]*").fullmatch
+
+
+_BOX_LOOKUP: Optional[Dict[str, "Box"]] = None
+
+
+def _get_box(name: str) -> "Box":
+    """Get a box from its name in BOXES."""
+    global _BOX_LOOKUP
+    if _BOX_LOOKUP is None:
+        from rich import box
+
+        _BOX_LOOKUP = {
+            box_name: getattr(box, box_name.upper())
+            for box_name in BOXES
+            if box_name != "none"
+        }
+    return _BOX_LOOKUP[name]
+
+
+_console: Optional["Console"] = None
+_error_console: Optional["Console"] = None
+_session: Optional["Session"] = None
+
+
+def _get_console(
+    emoji: bool = False, record: bool = False, force_terminal: bool = False
+) -> "Console":
+    """Get a console for output, reusing the default console if there are no options."""
+    global _console
+    from rich.console import Console
+
+    if emoji or record or force_terminal:
+        return Console(
+            emoji=emoji,
+            record=record,
+            force_terminal=force_terminal if force_terminal else None,
+        )
+    if _console is None:
+        _console = Console(emoji=False)
+    return _console
+
+
+def _get_error_console() -> "Console":
+    """Get a console that writes to stderr."""
+    global _error_console
+    if _error_console is None:
+        from rich.console import Console
+
+        _error_console = Console(stderr=True)
+    return _error_console
+
+
+def _get_session() -> "Session":
+    """Get a requests session, shared for the lifetime of the process."""
+    global _session
+    if _session is None:
+        import requests
+
+        _session = requests.Session()
+        _session.headers["User-Agent"] = f"rich-cli/{VERSION}"
+    return _session
+
 
 def on_error(message: str, error: Optional[Exception] = None, code=-1) -> NoReturn:
     """Render an error message then exit the app."""
+    from rich.text import Text
 
+    error_console = _get_error_console()
     if error:
         error_text = Text(message)
         error_text.stylize("bold red")
@@ -67,17 +159,83 @@ def on_error(message: str, error: Optional[Exception] = None, code=-1) -> NoRetu
     sys.exit(code)
 
 
-def read_resource(path: str, lexer: Optional[str]) -> Tuple[str, Optional[str]]:
-    """Read a resource form a file or stdin."""
+def _read_stdin() -> str:
+    """Read all of stdin as bytes and decode in one go."""
+    text = sys.stdin.buffer.read().decode(sys.stdin.encoding or "utf-8", "replace")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+@lru_cache(maxsize=None)
+def _get_suffix_lexers() -> Dict[str, str]:
+    """Map file suffixes to lexer aliases, from Pygments' built in lexer table.
+
+    Suffixes claimed by more than one lexer are left out, as picking between them
+    requires looking at the content. So are suffixes that end a more specific
+    pattern (e.g. CMakeLists.txt), which Pygments would match first.
+    """
+    # _mapping is private to Pygments, but is the only way to read the patterns
+    # without importing every lexer module
+    from pygments.lexers._mapping import LEXERS
+
+    suffix_aliases: Dict[str, Set[str]] = {}
+    shadowed: Set[str] = set()
+    for _module, _name, aliases, filenames, _mime_types in LEXERS.values():
+        if not aliases:
+            continue
+        for filename in filenames:
+            suffix = filename[2:]
+            if filename.startswith("*.") and suffix.isalnum():
+                suffix_aliases.setdefault(suffix, set()).add(aliases[0])
+            else:
+                shadowed.add(os.path.splitext(filename)[1][1:])
+    return {
+        suffix: aliases.pop()
+        for suffix, aliases in suffix_aliases.items()
+        if len(aliases) == 1 and suffix not in shadowed
+    }
+
+
+def _lexer_from_path(path: str) -> Optional[str]:
+    """Get a lexer name from a path's extension, if only one lexer handles it."""
+    ext = os.path.splitext(path)[1][1:]
+    if not ext:
+        return None
+    return COMMON_LEXERS.get(ext.lower()) or _get_suffix_lexers().get(ext)
+
+
+def read_resource(
+    path: str, lexer: Optional[str], head: Optional[int] = None
+) -> Tuple[str, Optional[str]]:
+    """Read a resource form a file or stdin.
+
+    If `head` is given, URLs are streamed and only the first `head` lines are read.
+    """
     if not path:
         on_error("missing path or URL")
 
     if path.startswith(("http://", "https://")):
-        import requests
+        try:
+            response = _get_session().get(path, stream=True, timeout=(5, 30))
+            response.raise_for_status()
+            # Decode with the declared charset rather than letting requests guess
+            response.encoding = response.encoding or "utf-8"
 
-        response = requests.get(path)
+            if head is None:
+                text = response.content.decode(response.encoding, errors="replace")
+            else:
+                from itertools import islice
+
+                with response:
+                    lines = cast(
+                        Iterator[str], response.iter_lines(decode_unicode=True)
+                    )
+                    text = "\n".join(islice(lines, head))
+        except Exception as error:
+            from rich.markup import escape
 
-        text = response.text
+            on_error(f"unable to read {escape(path)}", error)
         try:
             mime_type: str = response.headers["Content-Type"]
             if ";" in mime_type:
@@ -86,10 +244,9 @@ def read_resource(path: str, lexer: Optional[str]) -> Tuple[str, Optional[str]]:
             pass
         else:
             if not lexer:
-                _, dot, ext = path.rpartition(".")
-                if dot and ext:
-                    ext = ext.lower()
-                    lexer = COMMON_LEXERS.get(ext, None)
+                from urllib.parse import urlparse
+
+                lexer = _lexer_from_path(urlparse(path).path)
                 if lexer is None:
                     from pygments.lexers import get_lexer_for_mimetype
 
@@ -100,24 +257,25 @@ def read_resource(path: str, lexer: Optional[str]) -> Tuple[str, Optional[str]]:
         return (text, lexer)
     try:
         if path == "-":
-            return (sys.stdin.read(), None)
+            return (_read_stdin(), lexer)
 
         with open(path, "rt", encoding="utf8", errors="replace") as resource_file:
             text = resource_file.read()
         if not lexer:
-            _, dot, ext = path.rpartition(".")
-            if dot and ext:
-                ext = ext.lower()
-                lexer = COMMON_LEXERS.get(ext, None)
+            lexer = _lexer_from_path(path)
         if not lexer:
             from pygments.lexers import guess_lexer_for_filename
+            from pygments.util import ClassNotFound
 
+            # Only a sample of the text is needed to choose between lexers
             try:
-                lexer = guess_lexer_for_filename(path, text).name
+                lexer = guess_lexer_for_filename(path, text[:4096]).name
             except ClassNotFound:
                 return (text, "text")
         return (text, lexer)
     except Exception as error:
+        from rich.markup import escape
+
         on_error(f"unable to read {escape(path)}", error)
 
 
@@ -144,20 +302,28 @@ class ForceWidth:
 
 def blend_text(
     message: str, color1: Tuple[int, int, int], color2: Tuple[int, int, int]
-) -> Text:
+) -> "Text":
     """Blend text from one color to another."""
-    text = Text(message)
+    from rich.color import Color
+    from rich.style import Style
+    from rich.text import Span, Text
+
     r1, g1, b1 = color1
     r2, g2, b2 = color2
     dr = r2 - r1
     dg = g2 - g1
     db = b2 - b1
-    size = len(text)
+    size = len(message)
+    styles: Dict[Tuple[int, int, int], Style] = {}
+    spans: List[Span] = []
     for index in range(size):
         blend = index / size
-        color = f"#{int(r1 + dr * blend):02X}{int(g1 + dg * blend):02X}{int(b1 + db * blend):02X}"
-        text.stylize(color, index, index + 1)
-    return text
+        rgb = (int(r1 + dr * blend), int(g1 + dg * blend), int(b1 + db * blend))
+        style = styles.get(rgb)
+        if style is None:
+            style = styles[rgb] = Style(color=Color.from_rgb(*rgb))
+        spans.append(Span(index, index + 1, style))
+    return Text(message, spans=spans)
 
 
 class RichCommand(click.Command):
@@ -170,6 +336,7 @@ class RichCommand(click.Command):
         from rich.highlighter import RegexHighlighter
         from rich.panel import Panel
         from rich.table import Table
+        from rich.text import Text
         from rich.theme import Theme
 
         class OptionHighlighter(RegexHighlighter):
@@ -180,22 +347,18 @@ class RichCommand(click.Command):
 
         highlighter = OptionHighlighter()
 
-        console = Console(
-            theme=Theme(
-                {
-                    "option": "bold cyan",
-                    "switch": "bold green",
-                }
-            ),
-            highlighter=highlighter,
+        theme = Theme(
+            {
+                "option": "bold cyan",
+                "switch": "bold green",
+            }
         )
 
-        console.print(
+        header = Text.from_markup(
             f"[b]Rich CLI[/b] [magenta]v{VERSION}[/] 🤑\n\n[dim]Rich text and formatting in the terminal\n",
             justify="center",
         )
-
-        console.print(
+        usage = Text.from_markup(
             "Usage: [b]rich[/b] [b][OPTIONS][/] [b cyan]<PATH,TEXT,URL, or '-'>\n"
         )
 
@@ -213,35 +376,40 @@ class RichCommand(click.Command):
             if param.metavar:
                 opt2 += Text(f" {param.metavar}", style="bold yellow")
 
-            options = Text(" ".join(reversed(param.opts)))
             help_record = param.get_help_record(ctx)
             if help_record is None:
                 help = ""
             else:
-                help = Text.from_markup(param.get_help_record(ctx)[-1], emoji=False)
-
-            if param.metavar:
-                options += f" {param.metavar}"
+                help = Text.from_markup(help_record[-1], emoji=False)
 
             options_table.add_row(opt1, opt2, highlighter(help))
 
-        console.print(
-            Panel(
-                options_table, border_style="dim", title="Options", title_align="left"
-            )
-        )
-
         from rich.color import Color
+        from rich.console import Group
 
-        console.print(
-            blend_text(
-                "♥ https://www.textualize.io",
-                Color.parse("#b169dd").triplet,
-                Color.parse("#542c91").triplet,
-            ),
-            justify="left",
-            style="bold",
+        footer = blend_text(
+            "♥ https://www.textualize.io",
+            Color.parse("#b169dd").triplet,
+            Color.parse("#542c91").triplet,
         )
+        footer.justify = "left"
+        footer.style = "bold"
+
+        console = _get_console()
+        with console.use_theme(theme):
+            console.print(
+                Group(
+                    header,
+                    usage,
+                    Panel(
+                        options_table,
+                        border_style="dim",
+                        title="Options",
+                        title_align="left",
+                    ),
+                    footer,
+                )
+            )
 
 
 @click.command(cls=RichCommand)
@@ -336,7 +504,7 @@ class RichCommand(click.Command):
     "--panel",
     "-a",
     default="none",
-    type=click.Choice(BOXES),
+    type=click.Choice(BOXES, case_sensitive=False),
     metavar="BOX",
     help=f"Set panel type to [b]BOX[/b]. [dim]{BOX_TEXT}",
 )
@@ -409,7 +577,7 @@ def main(
     rst: bool = False,
     csv: bool = False,
     ipynb: bool = False,
-    inspect: bool = True,
+    inspect: bool = False,
     emoji: bool = False,
     left: bool = False,
     right: bool = False,
@@ -446,10 +614,10 @@ def main(
     if version:
         sys.stdout.write(f"{VERSION}\n")
         return
-    console = Console(
+    console = _get_console(
         emoji=emoji,
         record=bool(export_html or export_svg),
-        force_terminal=force_terminal if force_terminal else None,
+        force_terminal=force_terminal,
     )
 
     def print_usage() -> None:
@@ -475,29 +643,20 @@ def main(
 
     renderable: RenderableType = ""
 
-    resource_format = AUTO
-    if _print:
-        resource_format = PRINT
-    elif syntax:
-        resource_format = SYNTAX
-    elif json:
-        resource_format = JSON
-    elif markdown:
-        resource_format = MARKDOWN
-    elif rule:
-        resource_format = RULE
-    elif inspect:
-        resource_format = INSPECT
-    elif csv:
-        resource_format = CSV
-    elif rst:
-        resource_format = RST
-    elif ipynb:
-        resource_format = IPYNB
+    format_flags = (
+        (_print, PRINT),
+        (syntax, SYNTAX),
+        (json, JSON),
+        (markdown, MARKDOWN),
+        (rule, RULE),
+        (inspect, INSPECT),
+        (csv, CSV),
+        (rst, RST),
+        (ipynb, IPYNB),
+    )
+    resource_format = next((fmt for flag, fmt in format_flags if flag), AUTO)
 
     if resource_format == AUTO and "." in resource:
-        import os.path
-
         ext = ""
         if resource.startswith(("http://", "https://")):
             from urllib.parse import urlparse
@@ -511,16 +670,7 @@ def main(
         else:
             ext = os.path.splitext(resource)[-1].lower()
 
-        if ext == ".md":
-            resource_format = MARKDOWN
-        elif ext == ".json":
-            resource_format = JSON
-        elif ext in (".csv", ".tsv"):
-            resource_format = CSV
-        elif ext == ".rst":
-            resource_format = RST
-        elif ext == ".ipynb":
-            resource_format = IPYNB
+        resource_format = EXTENSION_FORMATS.get(ext, AUTO)
 
     if resource_format == AUTO:
         resource_format = SYNTAX
@@ -539,12 +689,8 @@ def main(
             justify = "full"
 
         try:
-            if resource == "-":
-                renderable = Text.from_markup(
-                    sys.stdin.read(), justify=justify, emoji=emoji
-                )
-            else:
-                renderable = Text.from_markup(resource, justify=justify, emoji=emoji)
+            markup = _read_stdin() if resource == "-" else resource
+            renderable = Text.from_markup(markup, justify=justify, emoji=emoji)
             renderable.no_wrap = no_wrap
 
         except Exception as error:
@@ -629,13 +775,14 @@ def main(
         from rich.syntax import Syntax
 
         try:
-            if resource == "-":
-                code = sys.stdin.read()
-            else:
-                code, lexer = read_resource(resource, lexer)
+            code, lexer = read_resource(resource, lexer, head)
 
-            num_lines = len(code.splitlines())
-            line_range = _line_range(head, tail, num_lines)
+            line_range = None
+            if head is not None or tail is not None:
+                num_lines = code.count("\n") + (
+                    1 if code and not code.endswith("\n") else 0
+                )
+                line_range = _line_range(head, tail, num_lines)
             renderable = Syntax(
                 code,
                 lexer,
@@ -655,7 +802,6 @@ def main(
         renderable = Padding(renderable, tuple(print_padding), expand=expand)
 
     if panel != "none":
-        from rich import box
         from rich.panel import Panel
         from rich.style import Style
 
@@ -666,7 +812,7 @@ def main(
 
         renderable = Panel(
             renderable,
-            getattr(box, panel.upper()),
+            _get_box(panel),
             expand=expand,
             title=title,
             subtitle=caption,
@@ -739,7 +885,7 @@ def render_csv(
     tail: Optional[int] = None,
     title: Optional[str] = None,
     caption: Optional[str] = None,
-) -> RenderableType:
+) -> "RenderableType":
     """Render resource as CSV.
 
     Args:
@@ -750,12 +896,10 @@ def render_csv(
     """
     import io
     import csv
-    import re
+    from collections import deque
+    from itertools import islice
     from rich import box
     from rich.table import Table
-    from operator import itemgetter
-
-    is_number = re.compile(r"\-?[0-9]*?\.?[0-9]*?").fullmatch
 
     csv_data, _ = read_resource(resource, "csv")
     sniffer = csv.Sniffer()
@@ -789,26 +933,29 @@ def render_csv(
         for column in header:
             table.add_column(column)
 
-    table_rows = [row for row in rows if row]
+    table_rows: Iterable[List[str]] = filter(None, rows)
     if head is not None:
-        table_rows = table_rows[:head]
+        table_rows = islice(table_rows, head)
     elif tail is not None:
-        table_rows = table_rows[-tail:]
-    for row in table_rows:
-        if row:
-            table.add_row(*row)
-
-    for index, table_column in enumerate(table.columns):
-        get_index = itemgetter(index)
+        table_rows = deque(table_rows, maxlen=tail)
 
-        for row in table_rows:
-            try:
-                value = get_index(row)
-                if value and not is_number(value):
-                    break
-            except Exception:
-                break
-        else:
+    # A column is numeric if every row has a number (or nothing) in it
+    numeric_columns = [True] * len(table.columns)
+    first_row = True
+    add_row = table.add_row
+    for row in table_rows:
+        add_row(*row)
+        if len(row) > len(numeric_columns):
+            numeric_columns.extend([first_row] * (len(row) - len(numeric_columns)))
+        first_row = False
+        for index, numeric in enumerate(numeric_columns):
+            if numeric and (
+                index >= len(row) or (row[index] and not _IS_NUMBER(row[index]))
+            ):
+                numeric_columns[index] = False
+
+    for table_column, numeric in zip(table.columns, numeric_columns):
+        if numeric:
             table_column.justify = "right"
             table_column.style = "bold green"
             table_column.header_style = "bold green"
@@ -826,7 +973,7 @@ def render_ipynb(
     line_numbers: bool,
     guides: bool,
     no_wrap: bool,
-) -> RenderableType:
+) -> "RenderableType":
     """Render resource as Jupyter notebook.
 
     Args:
@@ -847,6 +994,7 @@ def render_ipynb(
     from rich.syntax import Syntax
     from rich.console import Group
     from rich.panel import Panel
+    from rich.text import Text
     from .markdown import Markdown
 
     notebook_str, _ = read_resource(resource, None)
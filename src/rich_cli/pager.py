@@ -1,4 +1,3 @@
-from enum import auto
 from typing import Iterable, List
 
 from rich.console import Console, ConsoleOptions, RenderResult
@@ -21,21 +20,19 @@ class PagerRenderable:
             lines (Iterable[List[Segment]]): Lists of segments forming lines.
             new_lines (bool, optional): Insert new lines after each line. Defaults to False.
         """
-        self.lines = list(lines)
-        self.new_lines = new_lines
+        new_line = Segment.line()
+        segments: List[Segment] = []
+        for line in lines:
+            segments.extend(Segment.simplify(line))
+            if new_lines:
+                segments.append(new_line)
+        self.segments = segments
         self.width = width
 
     def __rich_console__(
         self, console: "Console", options: "ConsoleOptions"
     ) -> "RenderResult":
-        if self.new_lines:
-            new_line = Segment.line()
-            for line in self.lines:
-                yield from line
-                yield new_line
-        else:
-            for line in self.lines:
-                yield from line
+        return self.segments
 
     def __rich_measure__(
         self, console: "Console", options: "ConsoleOptions"
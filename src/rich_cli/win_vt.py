@@ -14,24 +14,27 @@ import platform
 WINDOWS = platform.system() == "Windows"
 
 if WINDOWS:
-    from ctypes.wintypes import DWORD, byref
+    from ctypes import byref
+    from ctypes.wintypes import DWORD, HANDLE
 
     _STD_OUTPUT_HANDLE = -11
     _ENABLE_VIRTUAL_TERMINAL_PROCESSING = 0x0004
 
     _KERNEL32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    _KERNEL32.GetStdHandle.restype = HANDLE
+
+    # -11 is only an identifier for stdout, the console calls need the real handle
+    _STDOUT_HANDLE = _KERNEL32.GetStdHandle(_STD_OUTPUT_HANDLE)
 
     def _get_console_mode() -> int:
         """Get the current console mode."""
         mode = DWORD()
-        _KERNEL32.GetConsoleMode(_STD_OUTPUT_HANDLE, byref(mode))
+        _KERNEL32.GetConsoleMode(_STDOUT_HANDLE, byref(mode))
         return mode.value
 
     def _set_console_mode(mode: int) -> bool:
         """Set the current console mode."""
-        success = _KERNEL32.SetConsoleMode(
-            _STD_OUTPUT_HANDLE, mode | _ENABLE_VIRTUAL_TERMINAL_PROCESSING
-        )
+        success = _KERNEL32.SetConsoleMode(_STDOUT_HANDLE, mode)
         return success
 
     @contextmanager
@@ -42,6 +45,10 @@ if WINDOWS:
 
         """
         current_console_mode = _get_console_mode()
+        if current_console_mode & _ENABLE_VIRTUAL_TERMINAL_PROCESSING:
+            # Already enabled (the default on recent Windows 10), nothing to restore
+            yield
+            return
         success = _set_console_mode(
             current_console_mode | _ENABLE_VIRTUAL_TERMINAL_PROCESSING
         )